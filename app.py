@@ -1,13 +1,29 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import pytz
 import base64
+import csv
+import json
+import hashlib
+import hmac
+import html
 import requests
-from io import StringIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from io import BytesIO, StringIO
+import time
 import uuid
-import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# orjson parses the large base64 contents payloads much faster when installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # -------------------------------
 # CONFIG
@@ -25,6 +41,24 @@ TIMEZONE = pytz.timezone("America/New_York")
 # -------------------------------
 EMPLOYEE_COLUMNS = ["employee_id", "name", "role", "hourly_rate"]
 TASKLIST_COLUMNS = ["task_type_id", "task_name", "category"]
+# Seeded into an empty task list on first load
+DEFAULT_TASKLIST = [
+    {
+        "task_type_id": "TT_SALES_1",
+        "task_name": "Sales – First Contact Reply",
+        "category": "Sales",
+    },
+    {
+        "task_type_id": "TT_SALES_2",
+        "task_name": "Sales – Schedule Site Survey",
+        "category": "Sales",
+    },
+    {
+        "task_type_id": "TT_OPS_1",
+        "task_name": "Construction – Pull Fiber",
+        "category": "Construction",
+    },
+]
 TASK_COLUMNS = [
     "task_id",
     "date",
@@ -40,10 +74,60 @@ TASK_COLUMNS = [
     "duration_minutes",
     "cost",
 ]
+TASK_DATETIME_COLS = ["date", "start_time", "end_time"]
+# Written as local-time ISO strings (now.isoformat()) and restored to that
+# form on every rewrite, though the loader parses them to UTC
+TASK_LOCAL_TIME_COLS = ["start_time", "end_time"]
+# Columns Finish Task fills in on the active row, one scalar .at set each
+FINISH_COLUMNS = [
+    "task_type_id",
+    "task_name",
+    "task_category",
+    "customer",
+    "end_time",
+    "duration_minutes",
+    "cost",
+]
+TASK_LOG_LIMIT = 200
+TASK_LOG_DAYS = 7
+SELECT_TASK_PLACEHOLDER = "-- Select Task --"
+
+# Explicit read_csv dtypes so pandas skips type inference on every load
+EMPLOYEE_DTYPES = {
+    "employee_id": str,
+    "name": str,
+    "role": str,
+    "hourly_rate": "float64",
+}
+TASKLIST_DTYPES = {"task_type_id": str, "task_name": str, "category": str}
+TASK_DTYPES = {
+    **{col: str for col in TASK_COLUMNS},
+    # Free-text and id columns that are not categoricals stay Arrow-backed
+    "task_id": "string[pyarrow]",
+    "task_description": "string[pyarrow]",
+    "duration_minutes": "float64",
+    "cost": "float64",
+}
+
+# Low-cardinality label columns held as pandas categoricals once loaded
+EMPLOYEE_CATEGORICALS = ["role"]
+TASKLIST_CATEGORICALS = ["category"]
+TASK_CATEGORICALS = [
+    "employee_id",
+    "employee_name",
+    "task_type_id",
+    "task_category",
+    "task_name",
+    "customer",
+]
+TASK_STATUSES = ["Active", "Completed"]
 
 # -------------------------------
 # GITHUB CONFIG
 # -------------------------------
+# Secrets only change on redeploy, so the config dict is built once and shared
+# read-only by every caller
+@st.cache_resource
 def _github_cfg():
     cfg = st.secrets.get("github", {})
     return {
@@ -56,58 +140,289 @@ def _github_cfg():
     }
 
 
+# One pooled keep-alive session per token, reused across reruns, so GitHub
+# calls skip a fresh TCP/TLS handshake each time
+@st.cache_resource
+def _gh_session(token: str) -> requests.Session:
+    s = requests.Session()
+    s.headers.update(
+        {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+    )
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            # Only idempotent GETs are retried: a PUT that landed but timed
+            # out on read would be resent with a stale sha and double-append
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, allowed_methods=frozenset({"GET"})
+            ),
+        ),
+    )
+    return s
+
+
+# Blob sha of each file as last loaded or pushed by this process, shared by
+# all sessions, so a push can skip the GET and go straight to the PUT
+@st.cache_resource
+def _gh_shas() -> dict:
+    return {}
+
+
+# ETag and blob sha of each file's last full download, for conditional GETs
+@st.cache_resource
+def _gh_etags() -> dict:
+    return {}
+
+
+# -------------------------------
+# LOCAL SNAPSHOTS
+# -------------------------------
+# Typed Parquet copies of the GitHub CSVs, keyed by blob sha, so an unchanged
+# file is read back without re-parsing its CSV text. Best effort only.
+# Bump SNAPSHOT_VERSION whenever the loader's output dtypes change.
+SNAPSHOT_VERSION = 3
+
+
+def _snapshot_path(file_path: str, sha: str) -> Path:
+    stem = Path(file_path).stem
+    return DATA_DIR / f"{stem}.{sha[:12]}.v{SNAPSHOT_VERSION}.parquet"
+
+
+def _read_snapshot(file_path: str, sha: str, columns: list):
+    path = _snapshot_path(file_path, sha)
+    if not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path, engine="pyarrow", columns=columns)
+    except Exception:
+        return None
+
+
+def _write_snapshot(df: pd.DataFrame, file_path: str, sha: str):
+    try:
+        for old in DATA_DIR.glob(f"{Path(file_path).stem}.*.parquet"):
+            old.unlink()
+        df.to_parquet(
+            _snapshot_path(file_path, sha),
+            engine="pyarrow",
+            compression="zstd",
+            index=False,
+        )
+    except Exception:
+        pass
+
+
 # -------------------------------
 # LOAD FROM GITHUB
 # -------------------------------
-def _load_from_github(file_path: str, columns: list) -> pd.DataFrame:
+def _read_csv(raw: bytes, columns: list, dtypes: dict = None) -> pd.DataFrame:
+    # Only parse the expected columns that the file actually has; the rest
+    # are added empty by the caller. The decoded bytes are parsed in place,
+    # without materializing a str copy of the whole file.
+    first_line = raw.split(b"\n", 1)[0].rstrip(b"\r").decode("utf-8")
+    header = next(csv.reader([first_line]), [])
+    usecols = [col for col in columns if col in header]
+    try:
+        return pd.read_csv(
+            BytesIO(raw), usecols=usecols, dtype=dtypes, engine="pyarrow"
+        )
+    except Exception:
+        # Fall back to the C parser (pyarrow missing or rejecting the input)
+        return pd.read_csv(BytesIO(raw), usecols=usecols, dtype=dtypes)
+
+
+def _apply_types(
+    df: pd.DataFrame, categoricals: list = None, date_cols: list = None
+) -> pd.DataFrame:
+    # Every stored timestamp is ISO8601; rewritten rows use a space separator
+    # and plain 'date' values carry no time at all
+    for col in date_cols or []:
+        df[col] = pd.to_datetime(
+            df[col], errors="coerce", utc=True, format="ISO8601", cache=True
+        )
+    for col in categoricals or []:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _load_from_github(
+    file_path: str,
+    columns: list,
+    categoricals: list = None,
+    dtypes: dict = None,
+    date_cols: list = None,
+) -> pd.DataFrame:
     try:
         cfg = _github_cfg()
         url = f"https://api.github.com/repos/{cfg['repo']}/contents/{file_path}?ref={cfg['branch']}"
-        headers = {
-            "Authorization": f"token {cfg['token']}",
-            "Accept": "application/vnd.github.v3+json",
-        }
-        r = requests.get(url, headers=headers, timeout=10)
+        session = _gh_session(cfg["token"])
+        etags = _gh_etags()
+        known = etags.get(file_path)
+        headers = {"If-None-Match": known[0]} if known else {}
+        r = session.get(url, headers=headers, timeout=10)
+        if r.status_code == 304:
+            # Unchanged since the last load: no body to download or decode
+            _gh_shas()[file_path] = known[1]
+            snapshot = _read_snapshot(file_path, known[1], columns)
+            if snapshot is not None:
+                return snapshot
+            r = session.get(url, timeout=10)
         if r.status_code == 200:
-            content = base64.b64decode(r.json()["content"]).decode("utf-8")
-            df = pd.read_csv(StringIO(content))
+            payload = _json_loads(r.content)
+            _gh_shas()[file_path] = payload["sha"]
+            if r.headers.get("ETag"):
+                etags[file_path] = (r.headers["ETag"], payload["sha"])
+            snapshot = _read_snapshot(file_path, payload["sha"], columns)
+            if snapshot is not None:
+                return snapshot
+            raw = base64.b64decode(payload["content"])
+            df = _read_csv(raw, columns, dtypes)
             for col in columns:
                 if col not in df.columns:
                     df[col] = None
-            df = df.reindex(columns=columns)
+            df = _apply_types(df.reindex(columns=columns), categoricals, date_cols)
+            _write_snapshot(df, file_path, payload["sha"])
             return df.copy()
         elif r.status_code == 404:
-            return pd.DataFrame(columns=columns)
+            return _apply_types(
+                pd.DataFrame(columns=columns), categoricals, date_cols
+            )
         else:
             st.error(f"GitHub error: {r.json().get('message')}")
-            return pd.DataFrame(columns=columns)
+            return _apply_types(
+                pd.DataFrame(columns=columns), categoricals, date_cols
+            )
     except Exception as e:
         st.error(f"Load failed: {e}")
-        return pd.DataFrame(columns=columns)
+        return _apply_types(pd.DataFrame(columns=columns), categoricals, date_cols)
+
+
+# Admin connectivity check for one file; safe to run off the script thread.
+# Line counts are remembered per ETag, so an unchanged file answers with a
+# bodiless 304 instead of being downloaded again.
+def _probe(session: requests.Session, cfg: dict, file_path: str, counts: dict):
+    url = f"https://api.github.com/repos/{cfg['repo']}/contents/{file_path}?ref={cfg['branch']}"
+    known = counts.get(file_path)
+    headers = {"If-None-Match": known[0]} if known else {}
+    try:
+        r = session.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        return file_path, "Error"
+    if r.status_code == 304:
+        return file_path, f"Exists ({known[1]} lines)"
+    if r.status_code == 200:
+        # Data line count from a newline scan of the bytes, with no CSV parse.
+        # Quoted multi-line fields span several lines, so it is not a row count.
+        raw = base64.b64decode(_json_loads(r.content)["content"])
+        lines = raw.count(b"\n") + (not raw.endswith(b"\n")) - 1 if raw else 0
+        if r.headers.get("ETag"):
+            counts[file_path] = (r.headers["ETag"], lines)
+        return file_path, f"Exists ({lines} lines)"
+    if r.status_code == 404:
+        return file_path, "Not found"
+    return file_path, "Error"
+
+
+@st.cache_resource
+def _probe_counts() -> dict:
+    return {}
 
 
 # -------------------------------
 # SAFE PUSH
 # -------------------------------
-def _github_safe_put(df: pd.DataFrame, file_path: str, msg: str, columns: list) -> bool:
+def _serialize_csv(df: pd.DataFrame, columns: list, append_rows: list = None) -> str:
+    out = df.reindex(columns=columns)
+    for col in TASK_LOCAL_TIME_COLS:
+        if col in out.columns and isinstance(out[col].dtype, pd.DatetimeTZDtype):
+            out[col] = [
+                t.isoformat() if pd.notna(t) else None
+                for t in out[col].dt.tz_convert(TIMEZONE)
+            ]
+    buf = StringIO()
+    out.to_csv(buf, index=False, lineterminator="\n")
+    if append_rows:
+        # Pending rows are buffered as dicts and streamed after the existing
+        # frame in one pass instead of being concatenated into it
+        csv.writer(buf, lineterminator="\n").writerows(
+            [row.get(col) for col in columns] for row in append_rows
+        )
+    return buf.getvalue()
+
+
+def _append_csv(content: str, columns: list, append_rows: list):
+    # Appends keep the remote file verbatim and only add lines; bail out to a
+    # full rewrite when its header does not match the expected columns
+    header = next(csv.reader(StringIO(content)), None)
+    if header != columns:
+        return None
+    buf = StringIO()
+    buf.write(content if content.endswith("\n") else content + "\n")
+    csv.DictWriter(
+        buf, fieldnames=columns, extrasaction="ignore", lineterminator="\n"
+    ).writerows(append_rows)
+    return buf.getvalue()
+
+
+# Base64 output never needs JSON escaping, so the encoded file is spliced into
+# the request body as bytes instead of being decoded to str for json.dumps
+def _put_contents(session: requests.Session, url: str, payload: dict, body: str):
+    content = base64.b64encode(body.encode("utf-8"))
+    data = json.dumps(payload)[:-1].encode() + b', "content": "' + content + b'"}'
+    return session.put(
+        url, data=data, headers={"Content-Type": "application/json"}, timeout=30
+    )
+
+
+def _github_safe_put(
+    df: pd.DataFrame, file_path: str, msg: str, columns: list, append_rows: list = None
+) -> bool:
     try:
         cfg = _github_cfg()
-        token, repo, branch = cfg["token"], cfg["repo"], cfg["branch"]
-        headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json",
-        }
+        repo, branch = cfg["repo"], cfg["branch"]
+        session = _gh_session(cfg["token"])
         url = f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch}"
-        r = requests.get(url, headers=headers)
-        payload = {
-            "message": msg,
-            "content": base64.b64encode(df.to_csv(index=False).encode()).decode(),
-            "branch": branch,
-        }
-        if r.status_code == 200:
-            payload["sha"] = r.json()["sha"]
-        put = requests.put(url, headers=headers, json=payload)
-        return put.status_code in (200, 201)
+        shas = _gh_shas()
+        put = None
+        if file_path in shas:
+            payload = {"message": msg, "branch": branch, "sha": shas[file_path]}
+            body = _serialize_csv(df, columns, append_rows)
+            put = _put_contents(session, url, payload, body)
+        # No known sha, or the file moved on since it was loaded: re-read it
+        if put is None or put.status_code in (409, 422):
+            conflict = put is not None and put.status_code == 409
+            r = session.get(url, timeout=10)
+            current = _json_loads(r.content) if r.status_code == 200 else None
+            body = None
+            if current is not None and append_rows:
+                remote = base64.b64decode(current["content"]).decode()
+                body = _append_csv(remote, columns, append_rows)
+            if body is None and conflict:
+                # Rewriting from a stale frame would drop the other writer's
+                # changes, so reload and let the user retry on fresh data
+                shas.pop(file_path, None)
+                clear_cache()
+                st.warning(
+                    f"{file_path} changed on GitHub since it was loaded. "
+                    "Data has been reloaded; please try again."
+                )
+                return False
+            if body is None:
+                body = _serialize_csv(df, columns, append_rows)
+            payload = {"message": msg, "branch": branch}
+            if current is not None:
+                payload["sha"] = current["sha"]
+            put = _put_contents(session, url, payload, body)
+        if put.status_code in (200, 201):
+            shas[file_path] = put.json()["content"]["sha"]
+            return True
+        shas.pop(file_path, None)
+        return False
     except Exception as e:
         st.error(f"Push failed: {e}")
         return False
@@ -116,58 +431,93 @@ def _github_safe_put(df: pd.DataFrame, file_path: str, msg: str, columns: list)
 # -------------------------------
 # CACHED DATA
 # -------------------------------
-@st.cache_data(ttl=5, show_spinner="Loading from GitHub...")
+# Key cached frames by their ID column (kept as a column too) for O(1) lookups
+def _index_by(df: pd.DataFrame, id_col: str) -> pd.DataFrame:
+    return df.set_index(id_col, drop=False).rename_axis(None)
+
+
+# Employees and task types change rarely and tasks are invalidated on every
+# write from this app, so TTLs only bound staleness from other writers
+# (edits made on GitHub directly, other instances). Force Refresh clears all.
+REFERENCE_TTL = 3600
+TASKS_TTL = 300
+
+
+# Loaders share one frame across reruns via cache_resource, which skips the
+# pickle round-trip cache_data does on every hit; callers must not mutate it.
+# The Name/ID -> row dicts for the single-row lookups on Start/Finish are built
+# in the same cache entry as their frame, so a TTL expiry or reload can never
+# leave them out of step with the option lists. Built reversed so the first
+# row wins on duplicate keys, as the old .iloc[0] lookups did.
+@st.cache_resource(ttl=REFERENCE_TTL, show_spinner="Loading from GitHub...")
+def _load_employees():
+    df = _load_from_github(
+        _github_cfg()["emp_file"],
+        EMPLOYEE_COLUMNS,
+        EMPLOYEE_CATEGORICALS,
+        EMPLOYEE_DTYPES,
+    )
+    records = list(reversed(df.to_dict("records")))
+    by_name = {row["name"]: row for row in records}
+    by_id = {row["employee_id"]: row for row in records}
+    return df, by_name, by_id
+
+
+@st.cache_resource(ttl=REFERENCE_TTL, show_spinner="Loading task list...")
+def _load_tasklist():
+    df = _load_from_github(
+        _github_cfg()["tasklist_file"],
+        TASKLIST_COLUMNS,
+        TASKLIST_CATEGORICALS,
+        TASKLIST_DTYPES,
+    )
+    if df.empty:
+        df = pd.DataFrame(DEFAULT_TASKLIST, columns=TASKLIST_COLUMNS)
+        write_tasklist_to_github(df)
+    df = _index_by(df, "task_type_id")
+    by_name = {row["task_name"]: row for row in reversed(df.to_dict("records"))}
+    return df, by_name
+
+
 def get_employees():
-    return _load_from_github(_github_cfg()["emp_file"], EMPLOYEE_COLUMNS)
+    return _load_employees()[0]
+
+
+def get_employees_by_name():
+    return _load_employees()[1]
+
+
+def get_employees_by_id():
+    return _load_employees()[2]
 
 
-@st.cache_data(ttl=5, show_spinner="Loading task list...")
 def get_tasklist():
-    df = _load_from_github(_github_cfg()["tasklist_file"], TASKLIST_COLUMNS)
-    if df.empty:
-        defaults = [
-            {
-                "task_type_id": "TT_SALES_1",
-                "task_name": "Sales – First Contact Reply",
-                "category": "Sales",
-            },
-            {
-                "task_type_id": "TT_SALES_2",
-                "task_name": "Sales – Schedule Site Survey",
-                "category": "Sales",
-            },
-            {
-                "task_type_id": "TT_OPS_1",
-                "task_name": "Construction – Pull Fiber",
-                "category": "Construction",
-            },
-        ]
-        df = pd.DataFrame(defaults)
-        write_tasklist_to_github(df)
-    return df
+    return _load_tasklist()[0]
 
 
-@st.cache_data(ttl=5, show_spinner="Loading tasks...")
-def get_tasks():
-    df = _load_from_github(_github_cfg()["task_file"], TASK_COLUMNS)
+def get_tasklist_by_name():
+    return _load_tasklist()[1]
 
-    # Ensure all expected columns exist and in correct order
-    for col in TASK_COLUMNS:
-        if col not in df.columns:
-            df[col] = None
-    df = df.reindex(columns=TASK_COLUMNS)
+
+@st.cache_resource(ttl=TASKS_TTL, show_spinner="Loading tasks...")
+def get_tasks():
+    # Timestamps are parsed by the loader (and kept typed in its snapshot),
+    # so reruns reuse the cached datetime columns
+    df = _load_from_github(
+        _github_cfg()["task_file"],
+        TASK_COLUMNS,
+        dtypes=TASK_DTYPES,
+        date_cols=TASK_DATETIME_COLS,
+    )
 
     # Numeric fields
-    df["duration_minutes"] = pd.to_numeric(df["duration_minutes"], errors="coerce").fillna(0)
+    df["duration_minutes"] = pd.to_numeric(
+        df["duration_minutes"], errors="coerce"
+    ).fillna(0)
     df["cost"] = pd.to_numeric(df["cost"], errors="coerce").fillna(0)
 
     # Robust date handling: unify 'date' and 'start_time' into a single datetime (UTC)
-    date_series = pd.to_datetime(df["date"], errors="coerce", utc=True)
-    if "start_time" in df.columns:
-        start_ts = pd.to_datetime(df["start_time"], errors="coerce", utc=True)
-        date_series = date_series.fillna(start_ts)
-
-    df["date"] = date_series
+    df["date"] = df["date"].fillna(df["start_time"])
 
     # Normalize category if missing
     if "task_category" in df.columns:
@@ -175,41 +525,130 @@ def get_tasks():
     else:
         df["task_category"] = "Uncategorized"
 
-    return df
+    # Categoricals are applied after normalizing, so fillna can add new labels
+    for col in TASK_CATEGORICALS:
+        df[col] = df[col].astype("category")
+
+    # Rows stay in file order, so full rewrites serialize them as stored
+    return _index_by(df, "task_id")
+
+
+@st.cache_resource(ttl=TASKS_TTL, show_spinner=False)
+def get_task_report_frame():
+    # Report-only derived columns, computed once per load instead of per rerun.
+    # Every stored column is carried along so the filtered download comes from
+    # the same load as the aggregations.
+    tasks = get_tasks()
+    df = tasks.loc[tasks["date"].notna(), TASK_COLUMNS]
+    # Weeks start on Monday: step each day back by its weekday, vectorized
+    # rather than building a Period per row
+    day = df["date"].dt.tz_convert(None).dt.normalize()
+    return df.assign(
+        hours=df["duration_minutes"] / 60.0,
+        week_start=(day - pd.to_timedelta(day.dt.dayofweek, unit="D")).dt.date,
+    )
+
+
+@st.cache_resource(ttl=TASKS_TTL, show_spinner=False)
+def get_task_log_frame(since: date):
+    # Task Log rows are rebuilt only when the tasks cache is, not on every
+    # widget rerun. Only the rows in the window are sorted newest first; the
+    # cached tasks frame keeps file order for rewrites.
+    tasks = get_tasks()
+    recent = tasks[tasks["start_time"] >= pd.Timestamp(since).tz_localize(TIMEZONE)]
+    shown = recent.sort_values("start_time", ascending=False, kind="stable").head(
+        TASK_LOG_LIMIT
+    )
+
+    # Build just the editor's columns as a fresh frame instead of copying
+    # the full-width tasks slice and then dropping most of it
+    disp = pd.DataFrame(
+        {
+            "task_id": shown["task_id"],
+            # Use start_time to derive Date for display
+            "date": shown["start_time"].dt.tz_convert(TIMEZONE).dt.date,
+            "employee_name": shown["employee_name"],
+            "customer": shown["customer"],
+            "task_name": shown["task_name"],
+            "status": pd.Categorical(
+                np.where(shown["end_time"].isna(), "Active", "Completed"),
+                categories=TASK_STATUSES,
+            ),
+            "duration_minutes": shown["duration_minutes"],
+            "cost": shown["cost"],
+            # Delete checkbox column
+            "delete": False,
+        },
+        index=shown.index,
+    )
+    return disp, len(recent)
+
+
+# Categorical columns reject unseen labels, so edits work on an object copy
+def _uncategorize(df: pd.DataFrame) -> pd.DataFrame:
+    cats = df.select_dtypes("category").columns
+    return df.astype({col: object for col in cats})
 
 
 def clear_cache():
-    st.cache_data.clear()
+    for loader in (
+        _load_employees,
+        _load_tasklist,
+        get_tasks,
+        get_task_report_frame,
+        get_task_log_frame,
+        get_report,
+    ):
+        loader.clear()
+
+
+# Task writes only invalidate the task-derived caches, so the rerun after a
+# Start/Finish/Delete does not re-fetch the unchanged employee and task lists
+def clear_tasks_cache():
+    get_tasks.clear()
+    get_task_report_frame.clear()
+    get_task_log_frame.clear()
+    get_report.clear()
 
 
 # -------------------------------
 # WRITE & DELETE
 # -------------------------------
+# Random hex IDs are collision-free across sessions and app instances
+def _new_id(prefix: str) -> str:
+    return f"{prefix}{uuid.uuid4().hex[:12]}"
+
+
 def write_task_to_github(task: dict):
     df = get_tasks()
-    if task["task_id"] in df["task_id"].values:
+    # Tasks are indexed by task_id; the index's hash table is built once per
+    # cached frame, so this is a lookup rather than a column scan
+    if task["task_id"] in df.index:
         st.error("Task ID exists!")
         return False
-    df = pd.concat([df, pd.DataFrame([task])], ignore_index=True)
     success = _github_safe_put(
-        df, _github_cfg()["task_file"], f"Add {task['task_id']}", TASK_COLUMNS
+        df,
+        _github_cfg()["task_file"],
+        f"Add {task['task_id']}",
+        TASK_COLUMNS,
+        append_rows=[task],
     )
     if success:
-        clear_cache()
+        clear_tasks_cache()
     return success
 
 
 def delete_tasks_from_github(task_ids: list):
     df = get_tasks()
     before = len(df)
-    df = df[~df["task_id"].isin(task_ids)]
+    df = df.drop(index=task_ids, errors="ignore")
     if len(df) == before:
         st.warning("No tasks deleted.")
         return
     if _github_safe_put(
         df, _github_cfg()["task_file"], f"Delete {len(task_ids)} tasks", TASK_COLUMNS
     ):
-        clear_cache()
+        clear_tasks_cache()
         st.success(f"Deleted {len(task_ids)} task(s)!")
         st.rerun()
 
@@ -222,14 +661,175 @@ def write_employees_to_github(df: pd.DataFrame):
         st.rerun()
 
 
-def write_tasklist_to_github(df: pd.DataFrame):
+def write_tasklist_to_github(df: pd.DataFrame, append_rows: list = None):
     if _github_safe_put(
-        df, _github_cfg()["tasklist_file"], "Update tasklist", TASKLIST_COLUMNS
+        df,
+        _github_cfg()["tasklist_file"],
+        "Update tasklist",
+        TASKLIST_COLUMNS,
+        append_rows=append_rows,
     ):
         clear_cache()
         st.rerun()
 
 
+# -------------------------------
+# ACTIVE TASK
+# -------------------------------
+def _clear_active_task():
+    st.session_state.active_task_id = None
+    st.session_state.active_task_row = None
+    st.session_state.active_task_start_ts = None
+
+
+# Timer card, ticking client-side: the server renders the elapsed time and the
+# browser counts up from it every second, so no rerun reaches the server
+# between clicks
+def _render_timer_card(employee_name: str, start_ts: float):
+    elapsed = int(time.time() - start_ts)
+    hours, remainder = divmod(elapsed, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    components.html(
+        f"""
+        <div style="background-color:#e3f2fd;padding:20px;border-radius:12px;text-align:center;border:2px solid #1976d2;font-family:sans-serif;">
+            <h3>Active Task</h3>
+            <p><b>{html.escape(employee_name)}</b></p>
+            <h2 id="timer" style="color:#1976d2;font-family:monospace;">{hours:02d}:{minutes:02d}:{seconds:02d}</h2>
+        </div>
+        <script>
+            // Count up from the server-computed elapsed time using only the
+            // browser clock, so a skewed client clock cannot shift the value
+            const start = Date.now() - {elapsed} * 1000;
+            const pad = (n) => String(n).padStart(2, "0");
+            setInterval(() => {{
+                const s = Math.floor((Date.now() - start) / 1000);
+                document.getElementById("timer").textContent =
+                    pad(Math.floor(s / 3600)) + ":" + pad(Math.floor(s / 60) % 60) + ":" + pad(s % 60);
+            }}, 1000);
+        </script>
+        """,
+        height=190,
+    )
+
+
+# -------------------------------
+# ADMIN AUTH
+# -------------------------------
+# Compare fixed-length digests in constant time so the login response does
+# not leak how much of a password (or whether a user name) matched
+def _check_admin(admin_users, user: str, password: str) -> bool:
+    expected = hashlib.sha256(str(admin_users.get(user, "")).encode()).digest()
+    candidate = hashlib.sha256(password.encode()).digest()
+    return hmac.compare_digest(candidate, expected) and user in admin_users
+
+
+# -------------------------------
+# FORMATTING
+# -------------------------------
+def _fmt_mean(s: pd.Series, fmt: str) -> str:
+    # Series.mean already skips NaN; only an all-NaN input needs a fallback
+    m = s.mean()
+    return fmt.format(m if pd.notna(m) else 0)
+
+
+# -------------------------------
+# REPORTS
+# -------------------------------
+def compute_employee_summary(df: pd.DataFrame) -> pd.DataFrame:
+    # One bincount pass per column over the employee_name category codes,
+    # instead of a hashed groupby; code -1 (missing name) stays its own group
+    names = df["employee_name"]
+    groups, inverse = np.unique(names.cat.codes.to_numpy(), return_inverse=True)
+    return pd.DataFrame(
+        {
+            "employee_name": pd.Categorical.from_codes(groups, dtype=names.dtype),
+            "hours": np.bincount(inverse, weights=df["hours"].to_numpy()),
+            "cost": np.bincount(inverse, weights=df["cost"].to_numpy()),
+            "tasks": np.bincount(inverse),
+        }
+    )
+
+
+# Filtered frame and every report aggregation, cached per filter combination
+# so reruns that do not change the filters skip the groupbys entirely
+@st.cache_resource(ttl=TASKS_TTL, show_spinner=False)
+def get_report(
+    start_date: date, end_date: date, employee: str, customer: str, task: str
+) -> dict:
+    tasks = get_task_report_frame()
+
+    # Combine all filters into one mask and slice the cached frame once; the
+    # date range compares the UTC datetime64 column directly, end day inclusive
+    start_ts = pd.Timestamp(start_date, tz="UTC")
+    end_ts = pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=1)
+    mask = (tasks["date"] >= start_ts) & (tasks["date"] < end_ts)
+    if employee != "All":
+        mask &= tasks["employee_name"] == employee
+    if customer != "All":
+        mask &= tasks["customer"] == customer
+    if task != "All":
+        mask &= tasks["task_name"] == task
+    df = tasks.loc[mask]
+    report = {"df": df}
+    if df.empty:
+        return report
+
+    report["emp_sum"] = compute_employee_summary(df).sort_values(
+        "hours", ascending=False
+    )
+    report["weekly"] = (
+        df.groupby(["week_start", "employee_name"], dropna=False, observed=True)
+        .agg(hours=("hours", "sum"))
+        .reset_index()
+    )
+    report["cat_sum"] = (
+        df.groupby("task_category", dropna=False, observed=True)
+        .agg(hours=("hours", "sum"), cost=("cost", "sum"))
+        .reset_index()
+    )
+    report["dur"] = (
+        df[df["duration_minutes"] > 0]
+        .groupby("task_name", dropna=False, observed=True)
+        .agg(
+            avg_minutes=("duration_minutes", "mean"),
+            hours=("hours", "sum"),
+            tasks=("task_id", "size"),
+        )
+        .reset_index()
+        .sort_values("avg_minutes", ascending=False)
+    )
+    if df["customer"].notna().any():
+        # One customer pass feeds both the KPI table and the chart summary
+        cust_agg = (
+            df.groupby("customer", observed=True)
+            .agg(
+                hours=("hours", "sum"),
+                cost=("cost", "sum"),
+                tasks=("task_id", "size"),
+            )
+            .reset_index()
+        )
+        report["cust_sum"] = cust_agg[["customer", "hours", "cost"]]
+        cust = cust_agg[["customer", "tasks", "hours", "cost"]]
+        report["cust"] = cust.sort_values("hours", ascending=False)
+    else:
+        report["cust"] = pd.DataFrame(columns=["customer", "tasks", "hours", "cost"])
+    if task == "All":
+        report["task_sum"] = (
+            df.groupby("task_name", observed=True)
+            .agg(hours=("hours", "sum"), cost=("cost", "sum"))
+            .reset_index()
+        )
+    # Download payloads are encoded here, once per cached report, so reruns
+    # reuse the bytes and the cached dict is never written to afterwards.
+    # Same writer as pushes, so start/end times export as stored local ISO.
+    report["csv"] = {
+        key: _serialize_csv(report[key], list(report[key].columns)).encode("utf-8")
+        for key in ("emp_sum", "cat_sum", "dur", "weekly", "cust", "df")
+    }
+    return report
+
+
 # -------------------------------
 # SIDEBAR
 # -------------------------------
@@ -245,7 +845,9 @@ page = st.sidebar.radio("Go to", ["1. Task List", "2. Employee Tasks", "3. Admin
 # -------------------------------
 if page == "1. Task List":
     st.title("Task Library")
-    tasklist = get_tasklist().copy()
+    # Read-only view of the cached frame; the upsert path edits an
+    # uncategorized copy and appends never touch it
+    tasklist = get_tasklist()
     with st.form("add_task_type", clear_on_submit=True):
         c1, c2 = st.columns(2)
         with c1:
@@ -258,19 +860,28 @@ if page == "1. Task List":
                 st.warning("Name required")
             else:
                 if not tid:
-                    tid = f"TT_{str(uuid.uuid4())[:8]}"
+                    tid = _new_id("TT_")
                 new_row = {
                     "task_type_id": tid,
                     "task_name": task_name.strip(),
                     "category": category.strip() or "General",
                 }
-                tasklist = tasklist[tasklist["task_type_id"] != tid]
-                tasklist = pd.concat(
-                    [tasklist, pd.DataFrame([new_row])], ignore_index=True
-                )
-                write_tasklist_to_github(tasklist)
+                unchanged = tid in tasklist.index and tasklist.loc[
+                    [tid], TASKLIST_COLUMNS
+                ].to_numpy().tolist() == [[new_row[c] for c in TASKLIST_COLUMNS]]
+                if unchanged:
+                    # Saving an identical row would only push a no-op commit
+                    st.info("No changes to save.")
+                elif tid in tasklist.index:
+                    tasklist = _uncategorize(tasklist)
+                    tasklist.loc[tid] = pd.Series(new_row)
+                    write_tasklist_to_github(tasklist)
+                else:
+                    write_tasklist_to_github(tasklist, append_rows=[new_row])
     st.dataframe(
-        tasklist[["task_type_id", "task_name", "category"]], use_container_width=True
+        tasklist[["task_type_id", "task_name", "category"]],
+        hide_index=True,
+        use_container_width=True,
     )
 
 # -------------------------------
@@ -278,12 +889,17 @@ if page == "1. Task List":
 # -------------------------------
 elif page == "2. Employee Tasks":
     st.title("Employee Tasks")
+    # Tasks are loaded only where they are used (Finish, Task Log), so the
+    # Start handler and the empty-setup warning never pull the tasks CSV
     emps = get_employees()
     tasklist = get_tasklist()
-    tasks = get_tasks()
 
     if "active_task_id" not in st.session_state:
         st.session_state.active_task_id = None
+    if "active_task_row" not in st.session_state:
+        st.session_state.active_task_row = None
+    if "active_task_start_ts" not in st.session_state:
+        st.session_state.active_task_start_ts = None
 
     if emps.empty or tasklist.empty:
         st.warning("Add employees/tasks in Admin")
@@ -296,58 +912,51 @@ elif page == "2. Employee Tasks":
             if st.form_submit_button(
                 "Start Timer", disabled=st.session_state.active_task_id is not None
             ):
-                emp = emps[emps["name"] == emp_name].iloc[0]
-                now = datetime.now(TIMEZONE)
-                tid = f"T{str(uuid.uuid4())[:8]}"
-
-                # Start a new task with only employee + time.
-                # Task & customer will be added/edited while the timer runs.
-                new = {
-                    "task_id": tid,
-                    "date": now.date().isoformat(),
-                    "employee_id": emp["employee_id"],
-                    "employee_name": emp["name"],
-                    "task_type_id": None,
-                    "task_name": "",
-                    "task_category": "Uncategorized",
-                    "customer": "",
-                    "task_description": "",
-                    "start_time": now.isoformat(),
-                    "end_time": None,
-                    "duration_minutes": None,
-                    "cost": None,
-                }
-                if write_task_to_github(new):
-                    st.session_state.active_task_id = tid
-                    st.success("Timer Started!")
-                    st.rerun()
+                emp = get_employees_by_name().get(emp_name)
+                if emp is None:
+                    # The employee list changed on GitHub since the form rendered
+                    clear_cache()
+                    st.error(
+                        "Employee not found. Data has been reloaded; please try again."
+                    )
+                else:
+                    now = datetime.now(TIMEZONE)
+                    tid = _new_id("T")
+
+                    # Start a new task with only employee + time.
+                    # Task & customer will be added/edited while the timer runs.
+                    new = {
+                        "task_id": tid,
+                        "date": now.date().isoformat(),
+                        "employee_id": emp["employee_id"],
+                        "employee_name": emp["name"],
+                        "task_type_id": None,
+                        "task_name": "",
+                        "task_category": "Uncategorized",
+                        "customer": "",
+                        "task_description": "",
+                        "start_time": now.isoformat(),
+                        "end_time": None,
+                        "duration_minutes": None,
+                        "cost": None,
+                    }
+                    if write_task_to_github(new):
+                        st.session_state.active_task_id = tid
+                        st.session_state.active_task_row = new
+                        st.session_state.active_task_start_ts = now.timestamp()
+                        st.success("Timer Started!")
+                        st.rerun()
 
         # ---------------------------
         # ACTIVE TASK WITH LIVE TIMER + TASK/CUSTOMER INPUTS
         # ---------------------------
         if st.session_state.active_task_id:
-            tasks = get_tasks()
-            active_row = tasks[tasks["task_id"] == st.session_state.active_task_id]
-            if not active_row.empty:
-                active = active_row.iloc[0]
-                start = datetime.fromisoformat(active["start_time"]).astimezone(
-                    TIMEZONE
-                )
-                elapsed = datetime.now(TIMEZONE) - start
-                hours, remainder = divmod(int(elapsed.total_seconds()), 3600)
-                minutes, seconds = divmod(remainder, 60)
-
-                # Timer card
-                st.markdown(
-                    f"""
-                    <div style="background-color:#e3f2fd;padding:20px;border-radius:12px;text-align:center;border:2px solid #1976d2;">
-                        <h3>Active Task</h3>
-                        <p><b>{active['employee_name']}</b></p>
-                        <h2 style="color:#1976d2;font-family:monospace;">{hours:02d}:{minutes:02d}:{seconds:02d}</h2>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+            # The row started in this session is kept in session_state, so
+            # reruns render the timer without scanning the tasks frame
+            active = st.session_state.active_task_row
+            if active is not None:
+                start_ts = st.session_state.active_task_start_ts
+                _render_timer_card(active["employee_name"], start_ts)
 
                 st.markdown("### Task Details (fill in before finishing)")
 
@@ -360,7 +969,7 @@ elif page == "2. Employee Tasks":
                     if not tasklist.empty
                     else []
                 )
-                task_options = ["-- Select Task --"] + task_names
+                task_options = [SELECT_TASK_PLACEHOLDER] + task_names
 
                 # Default select index based on current active task_name
                 default_index = 0
@@ -392,76 +1001,75 @@ elif page == "2. Employee Tasks":
                         use_container_width=True,
                         key="finish_btn",
                     ):
-                        end = datetime.now(TIMEZONE)
-                        mins = (end - start).total_seconds() / 60
-                        rate = float(
-                            emps[emps["employee_id"] == active["employee_id"]].iloc[0][
-                                "hourly_rate"
-                            ]
-                        )
-                        cost = round((mins / 60) * rate, 2)
-
-                        # Determine final task info from selection
-                        final_task_name = active["task_name"]
-                        final_task_type_id = active["task_type_id"]
-                        final_task_category = active["task_category"]
-
-                        if selected_task != "-- Select Task --":
-                            typ_row = tasklist[tasklist["task_name"] == selected_task]
-                            if not typ_row.empty:
-                                typ = typ_row.iloc[0]
-                                final_task_name = typ["task_name"]
-                                final_task_type_id = typ["task_type_id"]
-                                final_task_category = typ["category"]
-
-                        final_customer = (customer_input or "").strip()
-
-                        df = get_tasks()
-                        mask = df["task_id"] == st.session_state.active_task_id
-
-                        df.loc[
-                            mask,
-                            [
-                                "task_type_id",
-                                "task_name",
-                                "task_category",
-                                "customer",
-                                "end_time",
-                                "duration_minutes",
-                                "cost",
-                            ],
-                        ] = [
-                            final_task_type_id,
-                            final_task_name,
-                            final_task_category,
-                            final_customer,
-                            end.isoformat(),
-                            mins,
-                            cost,
-                        ]
-
-                        if _github_safe_put(
-                            df,
-                            _github_cfg()["task_file"],
-                            "Finish task (with details)",
-                            TASK_COLUMNS,
-                        ):
-                            st.session_state.active_task_id = None
+                        emp = get_employees_by_id().get(active["employee_id"])
+                        if emp is None:
+                            # Employee removed on GitHub while the timer ran
                             clear_cache()
-                            st.success("Task Finished & Logged!")
-                            st.rerun()
+                            st.error(
+                                "Employee not found. Data has been reloaded; please try again."
+                            )
+                        else:
+                            end = datetime.now(TIMEZONE)
+                            mins = (end.timestamp() - start_ts) / 60
+                            rate = float(emp["hourly_rate"])
+                            cost = round((mins / 60) * rate, 2)
+
+                            # Determine final task info from selection
+                            final_task_name = active["task_name"]
+                            final_task_type_id = active["task_type_id"]
+                            final_task_category = active["task_category"]
+
+                            if selected_task != SELECT_TASK_PLACEHOLDER:
+                                typ = get_tasklist_by_name().get(selected_task)
+                                if typ is not None:
+                                    final_task_name = typ["task_name"]
+                                    final_task_type_id = typ["task_type_id"]
+                                    final_task_category = typ["category"]
+
+                            final_customer = (customer_input or "").strip()
+
+                            # Tasks are indexed by task_id: one lookup, one row write
+                            tasks = get_tasks()
+                            idx = active["task_id"]
+                            if idx not in tasks.index:
+                                st.warning("Active task not found. Clearing...")
+                                _clear_active_task()
+                            else:
+                                df = _uncategorize(tasks)
+                                finished = [
+                                    final_task_type_id,
+                                    final_task_name,
+                                    final_task_category,
+                                    final_customer,
+                                    end.isoformat(),
+                                    mins,
+                                    cost,
+                                ]
+                                for col, value in zip(FINISH_COLUMNS, finished):
+                                    df.at[idx, col] = value
+
+                                if _github_safe_put(
+                                    df,
+                                    _github_cfg()["task_file"],
+                                    "Finish task (with details)",
+                                    TASK_COLUMNS,
+                                ):
+                                    _clear_active_task()
+                                    clear_tasks_cache()
+                                    st.success("Task Finished & Logged!")
+                                    st.rerun()
                 with col2:
                     if st.button(
                         "Cancel Active Task",
                         type="secondary",
                         use_container_width=True,
                     ):
-                        st.session_state.active_task_id = None
+                        _clear_active_task()
                         st.rerun()
             else:
                 st.warning("Active task not found. Clearing...")
                 if st.button("Clear Active Task"):
-                    st.session_state.active_task_id = None
+                    _clear_active_task()
                     st.rerun()
 
         # ---------------------------
@@ -472,35 +1080,18 @@ elif page == "2. Employee Tasks":
         if tasks.empty:
             st.info("No tasks yet.")
         else:
-            disp = tasks.copy()
-
-            # Status column
-            disp["status"] = disp["end_time"].apply(
-                lambda x: "Completed" if pd.notna(x) else "Active"
+            since = st.sidebar.date_input(
+                "Show since",
+                value=datetime.now(TIMEZONE).date() - timedelta(days=TASK_LOG_DAYS),
             )
-
-            # Use start_time to derive Date for display
-            disp["date"] = pd.to_datetime(
-                disp["start_time"], errors="coerce"
-            ).dt.date
-
-            # Delete checkbox column
-            disp["delete"] = False
+            log, matched = get_task_log_frame(since)
+            if matched > TASK_LOG_LIMIT:
+                st.caption(
+                    f"Showing the latest {TASK_LOG_LIMIT} of {matched} tasks since {since}."
+                )
 
             edited = st.data_editor(
-                disp[
-                    [
-                        "task_id",
-                        "date",
-                        "employee_name",
-                        "customer",
-                        "task_name",
-                        "status",
-                        "duration_minutes",
-                        "cost",
-                        "delete",
-                    ]
-                ],
+                log,
                 column_config={
                     "task_id": st.column_config.TextColumn("ID", disabled=True),
                     "date": st.column_config.DateColumn("Date", disabled=True),
@@ -551,7 +1142,7 @@ elif page == "3. Admin":
                 u = st.text_input("User")
                 p = st.text_input("Password", type="password")
                 if st.form_submit_button("Login"):
-                    if u in admin_users and p == admin_users[u]:
+                    if _check_admin(admin_users, u, p):
                         st.session_state.auth = True
                         st.rerun()
                     else:
@@ -564,89 +1155,41 @@ elif page == "3. Admin":
 
             st.subheader("GitHub Sync")
             cfg = _github_cfg()
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                if st.button("Test Tasks CSV"):
-                    r = requests.get(
-                        f"https://api.github.com/repos/{cfg['repo']}/contents/{cfg['task_file']}?ref={cfg['branch']}",
-                        headers={
-                            "Authorization": f"token {cfg['token']}"
-                        },
-                    )
-                    st.write(
-                        "Exists"
-                        if r.status_code == 200
-                        else "Not found"
-                        if r.status_code == 404
-                        else "Error"
-                    )
-                if st.button("Sync Tasks CSV", type="primary"):
-                    df = get_tasks()
-                    if _github_safe_put(
-                        df,
-                        cfg["task_file"],
-                        "Manual sync tasks",
-                        TASK_COLUMNS,
-                    ):
-                        st.success("Synced!")
-                        clear_cache()
-                        st.rerun()
-            with c2:
-                if st.button("Test Employees CSV"):
-                    r = requests.get(
-                        f"https://api.github.com/repos/{cfg['repo']}/contents/{cfg['emp_file']}?ref={cfg['branch']}",
-                        headers={
-                            "Authorization": f"token {cfg['token']}"
-                        },
-                    )
-                    st.write(
-                        "Exists"
-                        if r.status_code == 200
-                        else "Not found"
-                        if r.status_code == 404
-                        else "Error"
-                    )
-                if st.button("Sync Employees CSV", type="primary"):
-                    df = get_employees()
-                    if _github_safe_put(
-                        df,
-                        cfg["emp_file"],
-                        "Manual sync employees",
-                        EMPLOYEE_COLUMNS,
-                    ):
-                        st.success("Synced!")
-                        clear_cache()
-                        st.rerun()
-            with c3:
-                if st.button("Test Tasklist CSV"):
-                    r = requests.get(
-                        f"https://api.github.com/repos/{cfg['repo']}/contents/{cfg['tasklist_file']}?ref={cfg['branch']}",
-                        headers={
-                            "Authorization": f"token {cfg['token']}"
-                        },
-                    )
-                    st.write(
-                        "Exists"
-                        if r.status_code == 200
-                        else "Not found"
-                        if r.status_code == 404
-                        else "Error"
+            # (label, config key, loader, columns) for each synced CSV
+            sync_specs = [
+                ("Tasks", "task_file", get_tasks, TASK_COLUMNS),
+                ("Employees", "emp_file", get_employees, EMPLOYEE_COLUMNS),
+                ("Tasklist", "tasklist_file", get_tasklist, TASKLIST_COLUMNS),
+            ]
+            if st.button("Test All CSVs"):
+                # The three probes run concurrently over the pooled session
+                session = _gh_session(cfg["token"])
+                counts = _probe_counts()
+                paths = [cfg[key] for _, key, _, _ in sync_specs]
+                with ThreadPoolExecutor(max_workers=len(paths)) as ex:
+                    results = list(
+                        ex.map(lambda path: _probe(session, cfg, path, counts), paths)
                     )
-                if st.button("Sync Tasklist CSV", type="primary"):
-                    df = get_tasklist()
-                    if _github_safe_put(
-                        df,
-                        cfg["tasklist_file"],
-                        "Manual sync tasklist",
-                        TASKLIST_COLUMNS,
-                    ):
-                        st.success("Synced!")
-                        clear_cache()
-                        st.rerun()
+                for path, status in results:
+                    st.write(f"{path}: {status}")
+            for col, (label, key, loader, columns) in zip(
+                st.columns(len(sync_specs)), sync_specs
+            ):
+                with col:
+                    if st.button(f"Sync {label} CSV", type="primary"):
+                        if _github_safe_put(
+                            loader(),
+                            cfg[key],
+                            f"Manual sync {label.lower()}",
+                            columns,
+                        ):
+                            st.success("Synced!")
+                            clear_cache()
+                            st.rerun()
 
             st.markdown("---")
             st.header("Reports")
-            tasks = get_tasks()
+            tasks = get_task_report_frame()
             emps = get_employees()
             tasklist = get_tasklist()
             if tasks.empty:
@@ -684,23 +1227,28 @@ elif page == "3. Admin":
                 )
                 selected_task = st.selectbox("Task", task_options)
 
-                df = tasks.copy()
-                df = df[
-                    (df["date"].dt.date >= start_date)
-                    & (df["date"].dt.date <= end_date)
-                ]
-                if selected_employee != "All":
-                    df = df[df["employee_name"] == selected_employee]
-                if selected_customer != "All":
-                    df = df[df["customer"] == selected_customer]
-                if selected_task != "All":
-                    df = df[df["task_name"] == selected_task]
+                report = get_report(
+                    start_date,
+                    end_date,
+                    selected_employee,
+                    selected_customer,
+                    selected_task,
+                )
+                df = report["df"]
 
                 if df.empty:
                     st.info("No data for selected filters.")
                 else:
+                    # Only the admin reports draw charts, so plotly is imported
+                    # here instead of on every cold start of the employee pages
+                    import plotly.express as px
+
                     today = datetime.now(TIMEZONE).date()
-                    today_df = df[df["date"].dt.date == today]
+                    today_ts = pd.Timestamp(today, tz="UTC")
+                    today_df = df[
+                        (df["date"] >= today_ts)
+                        & (df["date"] < today_ts + pd.Timedelta(days=1))
+                    ]
                     c1, c2, c3, c4 = st.columns(4)
                     c1.metric(
                         "Hours (Today)",
@@ -711,32 +1259,14 @@ elif page == "3. Admin":
                         f"${today_df['cost'].sum():,.2f}",
                     )
                     c3.metric("Tasks (Today)", int(len(today_df)))
-                    avg_mins = df[df["duration_minutes"] > 0][
-                        "duration_minutes"
-                    ].mean()
+                    durations = df["duration_minutes"]
                     c4.metric(
                         "Avg Task Duration (min)",
-                        f"{(avg_mins if pd.notna(avg_mins) else 0):.1f}",
+                        _fmt_mean(durations.where(durations > 0), "{:.1f}"),
                     )
                     st.markdown("---")
 
-                    df["hours"] = df["duration_minutes"] / 60.0
-                    df["week_start"] = df["date"].dt.to_period(
-                        "W-SUN"
-                    ).apply(lambda p: p.start_time.date())
-
-                    emp_sum = (
-                        df.groupby("employee_name", dropna=False)
-                        .agg(
-                            hours=("hours", "sum"),
-                            cost=("cost", "sum"),
-                            tasks=("task_id", "count"),
-                        )
-                        .reset_index()
-                    )
-                    emp_sum = emp_sum.sort_values(
-                        "hours", ascending=False
-                    )
+                    emp_sum = report["emp_sum"]
                     colA, colB = st.columns(2)
                     with colA:
                         fig = px.bar(
@@ -763,13 +1293,7 @@ elif page == "3. Admin":
                         )
                         st.plotly_chart(fig, use_container_width=True)
 
-                    weekly = (
-                        df.groupby(
-                            ["week_start", "employee_name"], dropna=False
-                        )
-                        .agg(hours=("hours", "sum"))
-                        .reset_index()
-                    )
+                    weekly = report["weekly"]
                     if not weekly.empty:
                         fig = px.bar(
                             weekly,
@@ -784,14 +1308,7 @@ elif page == "3. Admin":
                         )
                         st.plotly_chart(fig, use_container_width=True)
 
-                    cat_sum = (
-                        df.groupby("task_category", dropna=False)
-                        .agg(
-                            hours=("hours", "sum"),
-                            cost=("cost", "sum"),
-                        )
-                        .reset_index()
-                    )
+                    cat_sum = report["cat_sum"]
                     colC, colD = st.columns(2)
                     with colC:
                         fig = px.bar(
@@ -814,19 +1331,7 @@ elif page == "3. Admin":
                         )
                         st.plotly_chart(fig, use_container_width=True)
 
-                    dur = (
-                        df[df["duration_minutes"] > 0]
-                        .groupby("task_name", dropna=False)
-                        .agg(
-                            avg_minutes=("duration_minutes", "mean"),
-                            hours=("hours", "sum"),
-                            tasks=("task_id", "count"),
-                        )
-                        .reset_index()
-                    )
-                    dur = dur.sort_values(
-                        "avg_minutes", ascending=False
-                    )
+                    dur = report["dur"]
                     fig = px.bar(
                         dur.head(20),
                         x="task_name",
@@ -842,22 +1347,8 @@ elif page == "3. Admin":
                     # ---------------------------
                     # CUSTOMER KPI SUMMARY – ALL TASKS, TIME, COST
                     # ---------------------------
+                    cust = report["cust"]
                     if df["customer"].notna().any():
-                        cust = (
-                            df.groupby("customer")
-                            .agg(
-                                hours=("hours", "sum"),
-                                cost=("cost", "sum"),
-                                tasks=("task_id", "count"),
-                            )
-                            .reset_index()
-                        )
-
-                        cust = cust[["customer", "tasks", "hours", "cost"]]
-                        cust = cust.sort_values(
-                            "hours", ascending=False
-                        )
-
                         st.subheader("Customer KPI Summary – All Tasks")
                         st.dataframe(cust, use_container_width=True)
 
@@ -882,10 +1373,6 @@ elif page == "3. Admin":
                             st.plotly_chart(
                                 fig, use_container_width=True
                             )
-                    else:
-                        cust = pd.DataFrame(
-                            columns=["customer", "tasks", "hours", "cost"]
-                        )
 
                     st.subheader("Downloadable Summaries")
                     if df["customer"].notna().any():
@@ -909,7 +1396,7 @@ elif page == "3. Admin":
                         )
                         st.download_button(
                             label="Download Employees Summary",
-                            data=emp_sum.to_csv(index=False),
+                            data=report["csv"]["emp_sum"],
                             file_name="employees_summary.csv",
                             mime="text/csv",
                         )
@@ -919,7 +1406,7 @@ elif page == "3. Admin":
                         )
                         st.download_button(
                             label="Download Categories Summary",
-                            data=cat_sum.to_csv(index=False),
+                            data=report["csv"]["cat_sum"],
                             file_name="categories_summary.csv",
                             mime="text/csv",
                         )
@@ -929,7 +1416,7 @@ elif page == "3. Admin":
                         )
                         st.download_button(
                             label="Download Task Durations",
-                            data=dur.to_csv(index=False),
+                            data=report["csv"]["dur"],
                             file_name="task_duration_summary.csv",
                             mime="text/csv",
                         )
@@ -942,7 +1429,7 @@ elif page == "3. Admin":
                         )
                         st.download_button(
                             label="Download Weekly Hours",
-                            data=weekly.to_csv(index=False),
+                            data=report["csv"]["weekly"],
                             file_name="weekly_hours.csv",
                             mime="text/csv",
                         )
@@ -953,20 +1440,13 @@ elif page == "3. Admin":
                             )
                             st.download_button(
                                 label="Download Customers Summary",
-                                data=cust.to_csv(index=False),
+                                data=report["csv"]["cust"],
                                 file_name="customers_summary.csv",
                                 mime="text/csv",
                             )
 
                     if selected_task == "All":
-                        task_sum = (
-                            df.groupby("task_name")
-                            .agg(
-                                hours=("hours", "sum"),
-                                cost=("cost", "sum"),
-                            )
-                            .reset_index()
-                        )
+                        task_sum = report["task_sum"]
                         col1, col2 = st.columns(2)
                         with col1:
                             fig = px.bar(
@@ -993,17 +1473,7 @@ elif page == "3. Admin":
                         selected_customer == "All"
                         and df["customer"].notna().any()
                     ):
-                        cust_sum = (
-                            df.groupby("customer")
-                            .agg(
-                                hours=(
-                                    "duration_minutes",
-                                    lambda x: x.sum() / 60,
-                                ),
-                                cost=("cost", "sum"),
-                            )
-                            .reset_index()
-                        )
+                        cust_sum = report["cust_sum"]
                         col1, col2 = st.columns(2)
                         with col1:
                             fig = px.bar(
@@ -1028,7 +1498,7 @@ elif page == "3. Admin":
 
                     st.download_button(
                         label="Download Filtered Tasks",
-                        data=df.to_csv(index=False),
+                        data=report["csv"]["df"],
                         file_name="filtered_tasks.csv",
                         mime="text/csv",
                     )